@@ -1,276 +1,612 @@
-# app.py
-import os
-from flask import Flask, request, render_template, jsonify
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-app = Flask(__name__)
-
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-   
-    raise ValueError("OPENAI_API_KEY environment variable not set. "
-                     "Please create a .env file in the same directory as app.py "
-                     "and add OPENAI_API_KEY=YOUR_API_KEY_HERE to it.")
-
-client = OpenAI(api_key=openai_api_key)
-
-def clarify_concept(concept_query: str, subject_context: str = "") -> str:
-    """
-    Generates an explanation for an engineering concept using an LLM.
-    Optionally includes a subject context to tailor the explanation.
-    """
-    system_prompt = (
-        "You are an AI assistant for engineering students on the Edwisely platform. "
-        "Your goal is to provide clear, concise, and accurate explanations of engineering concepts. "
-        "Always tailor your explanation for an engineering student, assuming they have some foundational knowledge "
-        "but need clarity on a specific topic. "
-        "Where possible, include a simple, relevant example or analogy to aid understanding. "
-        "Conclude with a short, thought-provoking question related to the concept "
-        "to encourage deeper understanding and critical thinking."
-    )
-
-    # Construct the user's message, including optional context
-    user_message = f"Explain the concept: '{concept_query}'."
-    if subject_context:
-        user_message += f" Please explain it in the context of '{subject_context}'."
-
-    try:
-        # Make the API call to OpenAI
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", # Using gpt-3.5-turbo for cost-effectiveness and speed.
-                                   # You can change this to "gpt-4" if you have access and prefer higher quality.
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7, # Controls creativity. Lower for more direct answers, higher for more varied ones.
-            max_tokens=300 # Limits the length of the generated response to keep it concise
-        )
-        # Extract and return the AI's generated content
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        # Log any errors that occur during the API call for debugging
-        print(f"Error calling OpenAI API: {e}")
-        # Provide a user-friendly error message
-        return "I apologize, but I couldn't generate an explanation at this moment. Please try again later."
-
-@app.route('/')
-def index():
-    """
-    Renders the main HTML page for the application.
-    Flask will look for 'index.html' inside the 'templates' directory.
-    """
-    return render_template('index.html')
-
-@app.route('/clarify', methods=['POST'])
-def clarify():
-    """
-    API endpoint to receive concept queries from the frontend and return AI explanations.
-    It expects a JSON payload with 'query' and optional 'context' fields.
-    """
-    # Get JSON data from the request body
-    data = request.get_json()
-    concept_query = data.get('query')
-    subject_context = data.get('context', '') # Default to empty string if no context is provided
-
-    # Basic input validation
-    if not concept_query:
-        # Return a 400 Bad Request error if the concept query is missing
-        return jsonify({"error": "Concept query is required."}), 400
-
-    # Call the core function to get the AI explanation
-    explanation = clarify_concept(concept_query, subject_context)
-    
-    # Return the explanation as a JSON response
-    return jsonify({"explanation": explanation})
-
-if __name__ == '__main__':
-    # Ensure the 'templates' directory exists for Flask to find index.html
-    os.makedirs('templates', exist_ok=True)
-    
-    # This block is for convenience: it writes the index.html content
-    # directly into 'templates/index.html' when app.py is run.
-    # In a real project, you'd typically create index.html manually.
-    html_content = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Edwisely Concept Clarifier</title>
-    <!-- Tailwind CSS CDN for easy styling -->
-    <script src="https://cdn.tailwindcss.com"></script>
-    <!-- Google Font: Inter -->
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-    <style>
-        /* Custom CSS for a clean and modern look */
-        body {
-            font-family: 'Inter', sans-serif;
-            background-color: #f0f2f5; /* Light gray background */
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh; /* Full viewport height */
-            padding: 1rem; /* Padding around the content */
-        }
-        .container {
-            background-color: #ffffff; /* White background for the card */
-            border-radius: 1rem; /* Rounded corners */
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.1); /* Soft shadow */
-            padding: 2.5rem;
-            max-width: 600px; /* Max width for readability */
-            width: 100%; /* Full width on smaller screens */
-            text-align: center;
-        }
-        .input-field {
-            width: 100%;
-            padding: 0.75rem;
-            margin-bottom: 1rem;
-            border: 1px solid #d1d5db; /* Light gray border */
-            border-radius: 0.5rem;
-            font-size: 1rem;
-            outline: none; /* Remove default outline on focus */
-            transition: border-color 0.2s; /* Smooth transition for focus effect */
-        }
-        .input-field:focus {
-            border-color: #6366f1; /* Tailwind indigo-500 on focus */
-        }
-        .btn-primary {
-            background-color: #6366f1; /* Tailwind indigo-500 */
-            color: white;
-            padding: 0.75rem 1.5rem;
-            border-radius: 0.5rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: background-color 0.2s, transform 0.1s; /* Smooth hover effects */
-            border: none;
-            width: 100%;
-        }
-        .btn-primary:hover {
-            background-color: #4f46e5; /* Tailwind indigo-600 on hover */
-            transform: translateY(-1px); /* Slight lift effect */
-        }
-        .response-box {
-            background-color: #e0e7ff; /* Tailwind indigo-100 */
-            border: 1px solid #a5b4fc; /* Tailwind indigo-300 */
-            border-radius: 0.75rem;
-            padding: 1.5rem;
-            margin-top: 1.5rem;
-            text-align: left;
-            min-height: 100px; /* Minimum height for the response area */
-            overflow-y: auto; /* Enable scrolling if content overflows */
-            white-space: pre-wrap; /* Preserves whitespace and wraps text */
-            word-wrap: break-word; /* Breaks long words to prevent horizontal scroll */
-            font-size: 0.95rem;
-            color: #1e293b; /* Tailwind slate-800 */
-            line-height: 1.6; /* Improved readability */
-            position: relative; /* For positioning loading indicator */
-        }
-        .loading-indicator {
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            display: none; /* Hidden by default */
-            color: #6366f1; /* Tailwind indigo-500 */
-            font-weight: 600;
-        }
-        .logo {
-            width: 80px; /* Adjust size as needed */
-            margin-bottom: 1.5rem;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Placeholder image for a simple logo -->
-        <img src="https://placehold.co/80x80/6366f1/ffffff?text=AI" alt="Edwisely AI Logo" class="logo mx-auto">
-        <h1 class="text-3xl font-bold text-gray-800 mb-4">Edwisely Concept Clarifier</h1>
-        <p class="text-gray-600 mb-6">Get instant, personalized explanations for engineering concepts.</p>
-
-        <!-- Form for user input -->
-        <form id="clarifierForm" class="flex flex-col gap-4">
-            <input type="text" id="conceptInput" class="input-field" placeholder="Enter engineering concept (e.g., 'Mutex', 'Polymorphism')" required>
-            <input type="text" id="contextInput" class="input-field" placeholder="Optional: Subject/Context (e.g., 'Operating Systems')">
-            <button type="submit" class="btn-primary">Clarify Concept</button>
-        </form>
-
-        <!-- Area to display AI response -->
-        <div id="responseBox" class="response-box relative">
-            <p id="responseText" class="text-gray-700">Your explanations will appear here.</p>
-            <!-- Loading indicator -->
-            <div id="loadingIndicator" class="loading-indicator">Loading...</div>
-        </div>
-    </div>
-
-    <script>
-        // Event listener for form submission
-        document.getElementById('clarifierForm').addEventListener('submit', async function(event) {
-            event.preventDefault(); // Prevent default form submission (page reload)
-
-            // Get references to DOM elements
-            const conceptInput = document.getElementById('conceptInput');
-            const contextInput = document.getElementById('contextInput');
-            const responseText = document.getElementById('responseText');
-            const loadingIndicator = document.getElementById('loadingIndicator');
-            const submitButton = document.querySelector('.btn-primary');
-
-            // Get trimmed values from input fields
-            const concept = conceptInput.value.trim();
-            const context = contextInput.value.trim();
-
-            // Basic client-side validation
-            if (!concept) {
-                responseText.textContent = "Please enter a concept to clarify.";
-                return; // Stop execution if no concept is entered
-            }
-
-            // UI feedback: Clear previous response, show loading, disable button
-            responseText.textContent = ""; 
-            loadingIndicator.style.display = 'block'; 
-            submitButton.disabled = true; 
-
-            try {
-                // Make a POST request to the Flask backend's /clarify endpoint
-                const response = await fetch('/clarify', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json', // Specify content type as JSON
-                    },
-                    // Send the concept and context as a JSON string in the request body
-                    body: JSON.stringify({ query: concept, context: context }),
-                });
-
-                // Check if the response was successful (status code 2xx)
-                if (!response.ok) {
-                    // If not successful, parse the error message from the server
-                    const errorData = await response.json();
-                    throw new Error(errorData.error || 'Something went wrong on the server.');
-                }
-
-                // Parse the JSON response from the server
-                const data = await response.json();
-                // Display the AI's explanation
-                responseText.textContent = data.explanation;
-            } catch (error) {
-                // Handle any errors that occurred during the fetch or processing
-                console.error('Error:', error);
-                responseText.textContent = `Error: ${error.message}. Please try again.`;
-            } finally {
-                // UI feedback: Hide loading, re-enable button, regardless of success or failure
-                loadingIndicator.style.display = 'none'; 
-                submitButton.disabled = false; 
-            }
-        });
-    </script>
-</body>
-</html>
-    """
-    with open('templates/index.html', 'w') as f:
-        f.write(html_content)
-
-    # Run the Flask application in debug mode (auto-reloads on code changes)
-    app.run(debug=True)
+# app.py
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+import httpx
+import tiktoken
+import uuid
+import orjson
+from quart import Quart, Response, g, request, jsonify
+from quart.json.provider import DefaultJSONProvider
+from openai import AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError
+from tenacity import (retry, stop_after_attempt, wait_exponential_jitter,
+                      retry_if_exception_type, before_sleep_log)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson (C implementation) instead of the
+    pure-Python stdlib json — jsonify and request.get_json both go through
+    it, which adds up under concurrent fan-out.
+    """
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Quart(__name__)
+app.json = ORJSONProvider(app)
+
+openai_api_key = os.getenv("OPENAI_API_KEY")
+if not openai_api_key:
+   
+    raise ValueError("OPENAI_API_KEY environment variable not set. "
+                     "Please create a .env file in the same directory as app.py "
+                     "and add OPENAI_API_KEY=YOUR_API_KEY_HERE to it.")
+
+# Keep the client module-level so the underlying httpx connection pool
+# (TCP + TLS) is reused across requests instead of re-handshaking each time.
+# HTTP/2 lets bursty fan-out multiplex many requests over one TLS connection
+# instead of opening (and handshaking) a socket per concurrent call.
+_http = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_CONCURRENCY", "50")),
+        max_keepalive_connections=50
+    )
+)
+# max_retries=0: retries are handled by tenacity in _call_openai, so the
+# SDK's built-in retry would only double up the backoff.
+client = AsyncOpenAI(api_key=openai_api_key, http_client=_http, max_retries=0)
+
+@app.after_serving
+async def _close_http_client():
+    """Closes the shared httpx pool cleanly on server shutdown."""
+    await _http.aclose()
+
+# English prose compresses 3-4x under gzip, which matters on slow mobile
+# links since the explanation JSON is the user-visible payload.
+_COMPRESS_MIMETYPES = {"application/json", "text/html", "text/css", "application/javascript"}
+_COMPRESS_MIN_SIZE = 500
+
+@app.after_request
+async def _compress_response(response):
+    """
+    gzips compressible responses for clients that advertise gzip support.
+    Streamed responses (unknown length, e.g. SSE) and tiny payloads are left
+    alone — compressing those costs more than it saves.
+    """
+    if (response.mimetype not in _COMPRESS_MIMETYPES
+            or response.content_length is None
+            or response.content_length < _COMPRESS_MIN_SIZE
+            or response.headers.get('Content-Encoding')
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    response.set_data(gzip.compress(await response.get_data(), 6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers.add('Vary', 'Accept-Encoding')
+    return response
+
+class _JSONLogFormatter(logging.Formatter):
+    """
+    Formats log records as single-line JSON so request ids, latencies and
+    token counts are machine-parseable instead of interpolated into prose.
+    """
+    _FIELDS = ("rid", "path", "status", "ms", "tokens")
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        for key in self._FIELDS:
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+logger = logging.getLogger("edwisely")
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(_JSONLogFormatter())
+logger.addHandler(_log_handler)
+logger.setLevel(logging.INFO)
+
+@app.before_request
+async def _tag_request():
+    """Stamps each request with a short id and a start time for latency logs."""
+    g.request_id = uuid.uuid4().hex[:8]
+    g.t0 = time.monotonic()
+
+@app.after_request
+async def _log_request(response):
+    """Logs one structured line per request: id, path, status and wall time."""
+    logger.info("request", extra={
+        "rid": g.get("request_id", "-"),
+        "path": request.path,
+        "status": response.status_code,
+        "ms": round((time.monotonic() - g.get("t0", time.monotonic())) * 1000, 1),
+    })
+    return response
+
+def _request_id() -> str:
+    """Returns the current request's id, or '-' outside a request context."""
+    try:
+        return g.get("request_id", "-")
+    except RuntimeError:
+        return "-"
+
+# Chat model for all clarification calls. gpt-4o-mini beats gpt-3.5-turbo on
+# quality, cost per token, and typical latency; override via env var to fall
+# back (e.g. OPENAI_MODEL=gpt-3.5-turbo) or upgrade without a code change.
+_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+class TokenBucket:
+    """
+    In-process token bucket so we pace ourselves under OpenAI's per-minute
+    quotas instead of hitting 429s: waiting locally in asyncio.sleep is far
+    cheaper than a rejected round trip plus backoff.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate          # tokens replenished per second
+        self.capacity = capacity  # maximum burst size
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: float = 1):
+        """Waits until n tokens are available, then consumes them."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+# One bucket for requests/minute and one for tokens/minute; both quotas are
+# enforced before every OpenAI call. Tune via env vars to match your tier.
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "90000"))
+REQ_BUCKET = TokenBucket(rate=OPENAI_RPM / 60, capacity=OPENAI_RPM)
+TOK_BUCKET = TokenBucket(rate=OPENAI_TPM / 60, capacity=OPENAI_TPM)
+
+_encoder = None
+_encoder_failed = False
+
+def _get_encoder():
+    """
+    Loads the tiktoken encoder for the configured model once and caches it.
+    Returns None if the encoder can't be loaded (the first load downloads the
+    BPE file, which needs egress); callers then fall back to character-based
+    estimates instead of failing the request.
+    """
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            try:
+                _encoder = tiktoken.encoding_for_model(_MODEL)
+            except KeyError:
+                # Unknown model name (e.g. a brand-new release): any modern
+                # encoding is close enough for quota estimation
+                _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoder_failed = True
+            logger.warning(f"tiktoken encoder unavailable, using character-based estimates: {e}")
+    return _encoder
+
+@app.before_serving
+async def _warm_encoder():
+    """
+    Fetches the tiktoken BPE file once at startup, in a worker thread, so the
+    synchronous download never blocks the event loop on a user request.
+    """
+    await asyncio.to_thread(_get_encoder)
+
+def _estimate_tokens(messages) -> int:
+    """Cheaply estimates prompt tokens for rate-limit accounting."""
+    encoder = _get_encoder()
+    if encoder is None:
+        # ~4 characters per token is a fair approximation for English text
+        return sum(len(m["content"]) for m in messages) // 4
+    return sum(len(encoder.encode(m["content"])) for m in messages)
+
+# Pre-flight input limits, checked before any network call: a pathological
+# query is rejected at the HTTP layer instead of burning an OpenAI round
+# trip and everyone else's rate-limit budget.
+_MAX_QUERY_CHARS = 2000
+_MAX_CONTEXT_CHARS = 500
+_MAX_QUERY_TOKENS = 400
+
+def _validate_input(concept_query: str, subject_context: str):
+    """
+    Validates a clarification request's inputs cheaply, before the API call.
+    Returns (error_message, http_status) when the input is unacceptable, or
+    None when it is fine.
+    """
+    if not concept_query.strip():
+        return "Concept query is required.", 400
+    if len(concept_query) > _MAX_QUERY_CHARS or len(subject_context) > _MAX_CONTEXT_CHARS:
+        return "Input is too long.", 413
+    # Without an encoder the character cap above still bounds the damage
+    encoder = _get_encoder()
+    if encoder is not None and len(encoder.encode(concept_query)) > _MAX_QUERY_TOKENS:
+        return "Concept query has too many tokens.", 413
+    return None
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+async def _call_openai(rid: str = "-", **kwargs):
+    """
+    Calls the chat completions API, retrying transient failures (rate limits,
+    timeouts, connection drops) with exponential backoff and jitter.
+    Client-side errors such as BadRequestError or AuthenticationError are not
+    retried and bubble up immediately.
+    Each attempt first takes a slot from both rate-limit buckets, charging the
+    estimated prompt tokens plus the generation ceiling against the TPM quota.
+    rid tags the log line with the originating request; it is passed in
+    explicitly because SSE generators run after the request context is popped,
+    where reading quart.g would raise.
+    """
+    await REQ_BUCKET.acquire()
+    await TOK_BUCKET.acquire(_estimate_tokens(kwargs.get("messages", ()))
+                             + kwargs.get("max_tokens", 300))
+    t0 = time.monotonic()
+    response = await client.chat.completions.create(**kwargs)
+    logger.info("openai_call", extra={
+        "rid": rid,
+        "ms": round((time.monotonic() - t0) * 1000, 1),
+        # Streaming calls return the stream object here, which has no usage
+        "tokens": getattr(getattr(response, "usage", None), "total_tokens", None),
+    })
+    return response
+
+# Exact-match response cache so identical (query, context) pairs become
+# in-memory lookups instead of repeated seconds-long OpenAI calls.
+# Size-capped OrderedDict used as an LRU; the lock keeps it safe under
+# concurrent batch fan-out.
+_CACHE_MAX_SIZE = 4096
+_response_cache: OrderedDict = OrderedDict()
+_cache_lock = asyncio.Lock()
+
+# The system message never changes, so build it once at import time and
+# share the dict across all requests (it must never be mutated). Only the
+# per-call user message is allocated per request. Kept deliberately short
+# (~40 tokens) since it is billed on every single call.
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are Edwisely's tutor for engineering students. "
+        "Explain the requested concept clearly and concisely, with one simple, "
+        "relevant example or analogy. "
+        "Conclude with one short, thought-provoking question about the concept."
+    )
+}
+
+# Generation ceiling per requested answer length. Decode time is roughly
+# linear in output tokens, so shorter answers return (and cost) less.
+_MAX_TOKENS = {"short": 120, "medium": 180, "long": 300}
+
+def _build_messages(concept_query: str, subject_context: str = "") -> list:
+    """
+    Builds the chat messages for a clarification request, shared by the
+    buffered and streaming endpoints. Only the user message is constructed
+    per call; the system message is the shared module-level dict.
+    """
+    user_message = (
+        f"Explain the concept: '{concept_query}'."
+        + (f" Please explain it in the context of '{subject_context}'." if subject_context else "")
+    )
+    return [_SYSTEM_MSG, {"role": "user", "content": user_message}]
+
+async def clarify_concept(concept_query: str, subject_context: str = "",
+                          length: str = "medium") -> tuple:
+    """
+    Generates an explanation for an engineering concept using an LLM.
+    Optionally includes a subject context to tailor the explanation, and a
+    length hint ("short" | "medium" | "long") that caps the generated tokens.
+    Returns a (explanation, cache_hit) tuple; repeated questions are served
+    from the in-memory cache without touching the OpenAI API.
+    """
+    # Normalize the key so trivial casing/whitespace differences still hit;
+    # length is part of the key since it changes the answer
+    cache_key = (concept_query.lower().strip(), subject_context.lower().strip(), length)
+    async with _cache_lock:
+        if cache_key in _response_cache:
+            # Refresh recency so popular concepts stay cached
+            _response_cache.move_to_end(cache_key)
+            return _response_cache[cache_key], True
+
+    try:
+        # Await the API call so the event loop can serve other users while
+        # this request waits on the OpenAI round trip.
+        response = await _call_openai(
+            rid=_request_id(),
+            model=_MODEL, # gpt-4o-mini by default; override with OPENAI_MODEL
+            messages=_build_messages(concept_query, subject_context),
+            temperature=0.7, # Controls creativity. Lower for more direct answers, higher for more varied ones.
+            max_tokens=_MAX_TOKENS[length] # Ceiling set by the requested answer length
+        )
+        # Extract the AI's generated content
+        explanation = response.choices[0].message.content.strip()
+        # Cache only successful generations, evicting the least recently used
+        # entry once the cap is reached
+        async with _cache_lock:
+            _response_cache[cache_key] = explanation
+            if len(_response_cache) > _CACHE_MAX_SIZE:
+                _response_cache.popitem(last=False)
+        return explanation, False
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {e}", extra={"rid": _request_id()})
+        # Provide a user-friendly error message
+        return ("I apologize, but I couldn't generate an explanation at this moment. "
+                "Please try again later."), False
+
+# The landing page is fully static (no template variables), so skip Jinja
+# entirely: read the file once, keep the bytes in memory, and let the
+# browser cache it instead of re-requesting on every visit.
+_index_page = None
+
+@app.route('/')
+async def index():
+    """
+    Serves the main HTML page for the application from memory.
+    The page is read from 'templates/index.html' on the first request only.
+    """
+    global _index_page
+    if _index_page is None:
+        with open('templates/index.html', 'rb') as f:
+            _index_page = f.read()
+    return Response(_index_page, mimetype='text/html',
+                    headers={'Cache-Control': 'public, max-age=3600'})
+
+@app.route('/clarify', methods=['POST'])
+async def clarify():
+    """
+    API endpoint to receive concept queries from the frontend and return AI explanations.
+    It expects a JSON payload with 'query' and optional 'context' fields.
+    """
+    # Get JSON data from the request body
+    data = await request.get_json()
+    concept_query = (data.get('query') or '').strip()
+    subject_context = (data.get('context') or '').strip() # Default to empty string if no context is provided
+    length = data.get('length', 'medium')
+
+    # Reject missing or pathological input before touching the network
+    error = _validate_input(concept_query, subject_context)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    if length not in _MAX_TOKENS:
+        return jsonify({"error": "length must be one of: short, medium, long."}), 400
+
+    # Call the core function to get the AI explanation
+    explanation, cache_hit = await clarify_concept(concept_query, subject_context, length)
+
+    # Return the explanation as a JSON response; cache_hit is included so
+    # clients (and logs) can see when the cache avoided an OpenAI call
+    return jsonify({"explanation": explanation, "cache_hit": cache_hit})
+
+@app.route('/clarify_stream', methods=['POST'])
+async def clarify_stream():
+    """
+    Streaming variant of /clarify that pushes tokens over Server-Sent Events
+    as OpenAI generates them, so the first words reach the user in roughly
+    one round trip instead of after the whole completion is buffered.
+    The plain /clarify endpoint is kept for legacy clients.
+    """
+    data = await request.get_json()
+    concept_query = (data.get('query') or '').strip()
+    subject_context = (data.get('context') or '').strip()
+    length = data.get('length', 'medium')
+
+    error = _validate_input(concept_query, subject_context)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    if length not in _MAX_TOKENS:
+        return jsonify({"error": "length must be one of: short, medium, long."}), 400
+
+    # Capture the id now: Quart iterates the generator after the request
+    # context is popped, where reading quart.g would raise RuntimeError
+    rid = _request_id()
+
+    async def sse_gen():
+        # Same normalized key as clarify_concept, so the buffered and
+        # streaming endpoints share one cache
+        cache_key = (concept_query.lower().strip(), subject_context.lower().strip(), length)
+        async with _cache_lock:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                _response_cache.move_to_end(cache_key)
+        if cached is not None:
+            # Cache hit: replay the whole explanation as a single event
+            yield f"data: {json.dumps({'t': cached})}\n\n"
+            yield "data: [DONE]\n\n"
+            return
+
+        parts = []
+        try:
+            stream = await _call_openai(
+                rid=rid,
+                model=_MODEL,
+                messages=_build_messages(concept_query, subject_context),
+                temperature=0.7,
+                max_tokens=_MAX_TOKENS[length],
+                stream=True
+            )
+            async for chunk in stream:
+                # Some chunks (e.g. the final usage frame) carry no choices
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ''
+                if delta:
+                    parts.append(delta)
+                    yield f"data: {json.dumps({'t': delta})}\n\n"
+        except Exception as e:
+            # Mid-stream the status line is already sent, so surface the
+            # failure as an SSE event instead of an HTTP error
+            logger.error(f"Error calling OpenAI API: {e}", extra={"rid": rid})
+            yield f"data: {json.dumps({'error': 'I apologize, but I could not generate an explanation at this moment. Please try again later.'})}\n\n"
+            return
+
+        # Cache the completed stream so repeats skip the OpenAI call,
+        # with the same LRU eviction as clarify_concept
+        explanation = ''.join(parts).strip()
+        if explanation:
+            async with _cache_lock:
+                _response_cache[cache_key] = explanation
+                if len(_response_cache) > _CACHE_MAX_SIZE:
+                    _response_cache.popitem(last=False)
+        yield "data: [DONE]\n\n"
+
+    return Response(sse_gen(), mimetype='text/event-stream')
+
+async def _clarify_one(item: dict, sem: asyncio.Semaphore) -> str:
+    """
+    Clarifies a single batch item while holding a slot in the shared semaphore,
+    so the number of in-flight OpenAI calls stays bounded.
+    """
+    async with sem:
+        # Items come straight from client JSON, so anything could be in the
+        # list; reject non-objects cleanly instead of leaking an AttributeError
+        if not isinstance(item, dict):
+            raise ValueError("Each item must be an object with a 'query' field.")
+        concept_query = (item.get('query') or '').strip()
+        subject_context = (item.get('context') or '').strip()
+        error = _validate_input(concept_query, subject_context)
+        if error:
+            raise ValueError(error[0])
+        length = item.get('length', 'medium')
+        if length not in _MAX_TOKENS:
+            raise ValueError("length must be one of: short, medium, long.")
+        explanation, _ = await clarify_concept(concept_query, subject_context, length)
+        return explanation
+
+@app.route('/clarify_batch', methods=['POST'])
+async def clarify_batch():
+    """
+    API endpoint to clarify several concepts in one HTTP call.
+    It expects a JSON payload like {"items": [{"query": ..., "context": ...}, ...]}
+    and fans the OpenAI calls out concurrently, bounded by OPENAI_CONCURRENCY.
+    """
+    data = await request.get_json()
+    # A top-level array or scalar is valid JSON, so guard before .get
+    items = data.get('items') if isinstance(data, dict) else None
+
+    if not isinstance(items, list) or not items:
+        # Return a 400 Bad Request error if no items were provided
+        return jsonify({"error": "A non-empty 'items' list is required."}), 400
+
+    # Bound the fan-out so a large batch can't exhaust the OpenAI rate limit
+    sem = asyncio.Semaphore(int(os.getenv("OPENAI_CONCURRENCY", "10")))
+    results = await asyncio.gather(
+        *(_clarify_one(item, sem) for item in items),
+        return_exceptions=True
+    )
+
+    # Map failures to per-item errors so one bad item doesn't kill the batch
+    payload = [
+        {"error": str(result)} if isinstance(result, Exception)
+        else {"explanation": result}
+        for result in results
+    ]
+    return jsonify({"results": payload})
+
+@app.route('/clarify_bulk', methods=['POST'])
+async def clarify_bulk():
+    """
+    Submits a non-interactive bulk clarification job to OpenAI's Batch API,
+    which is half the price of the real-time API with up to 24 h turnaround —
+    meant for offline jobs like pre-generating a course's concept bank.
+    Expects {"items": [{"custom_id": ..., "query": ..., "context": ...}, ...]}
+    and returns a batch_id to poll via GET /clarify_bulk/<batch_id>.
+    """
+    data = await request.get_json()
+    # A top-level array or scalar is valid JSON, so guard before .get
+    items = data.get('items') if isinstance(data, dict) else None
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "A non-empty 'items' list is required."}), 400
+
+    # Serialize each item to one Batch API JSONL line
+    lines = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({"error": f"Item {i}: each item must be an object with a 'query' field."}), 400
+        concept_query = (item.get('query') or '').strip()
+        subject_context = (item.get('context') or '').strip()
+        error = _validate_input(concept_query, subject_context)
+        if error:
+            return jsonify({"error": f"Item {i}: {error[0]}"}), error[1]
+        length = item.get('length', 'medium')
+        if length not in _MAX_TOKENS:
+            return jsonify({"error": f"Item {i}: length must be one of: short, medium, long."}), 400
+        lines.append(json.dumps({
+            "custom_id": str(item.get('custom_id', i)),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": _MODEL,
+                "messages": _build_messages(concept_query, subject_context),
+                "temperature": 0.7,
+                "max_tokens": _MAX_TOKENS[length]
+            }
+        }))
+    jsonl_bytes = "\n".join(lines).encode()
+
+    try:
+        batch_file = await client.files.create(
+            file=("clarify_bulk.jsonl", jsonl_bytes),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {e}", extra={"rid": _request_id()})
+        return jsonify({"error": "Could not submit the bulk job. Please try again later."}), 502
+
+    return jsonify({"batch_id": batch.id, "status": batch.status})
+
+@app.route('/clarify_bulk/<batch_id>', methods=['GET'])
+async def clarify_bulk_status(batch_id):
+    """
+    Polls a bulk clarification job. While the batch is still running only its
+    status is returned; once completed, the output file is downloaded and the
+    explanations come back as a {custom_id: explanation} mapping.
+    """
+    try:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            return jsonify({"batch_id": batch.id, "status": batch.status})
+
+        output = await client.files.content(batch.output_file_id)
+        results = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            body = (row.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            results[row["custom_id"]] = (
+                choices[0]["message"]["content"].strip() if choices else None
+            )
+        return jsonify({"batch_id": batch.id, "status": batch.status, "results": results})
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {e}", extra={"rid": _request_id()})
+        return jsonify({"error": "Could not retrieve the bulk job. Please try again later."}), 502
+
+if __name__ == '__main__':
+    # Development server only (single process, auto-reload). In production
+    # run under hypercorn with multiple workers instead:
+    #   hypercorn -c file:hypercorn_conf.py app:app
+    app.run(debug=True)
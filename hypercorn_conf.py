@@ -0,0 +1,17 @@
+# hypercorn_conf.py
+# Production server settings for the Quart app. Run with:
+#   hypercorn -c file:hypercorn_conf.py app:app
+# Each worker is a full asyncio event loop, so N workers can overlap many
+# OpenAI round trips instead of serializing users behind the dev server.
+import os
+
+bind = [os.getenv("BIND", "0.0.0.0:8000")]
+
+# I/O-bound workload: scale workers with CPUs, overridable via env var
+workers = int(os.getenv("WEB_CONCURRENCY", str((2 * (os.cpu_count() or 1)) + 1)))
+
+# Switch to "uvloop" for a faster event loop if uvloop is installed
+worker_class = "asyncio"
+
+keep_alive_timeout = 5
+graceful_timeout = 60